@@ -1,10 +1,28 @@
 #!/usr/bin/env python3
 import os
 import re
-import pandas as pd
+import string
 import csv
+import collections
+import functools
+import hashlib
+import shelve
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-import PyPDF2
+import pymupdf
+from dateutil import parser as date_parser
+
+try:
+    import re2  # google-re2 (opcional): motor DFA sin backtracking
+except ImportError:
+    re2 = None
+
+try:
+    import hyperscan  # Intel Hyperscan (opcional): búsqueda multi-patrón con SIMD
+except ImportError:
+    hyperscan = None
 
 # Lista de campos requeridos (en el orden deseado)
 required_fields = [
@@ -49,13 +67,173 @@ required_fields = [
 # Lista de campos que se deben formatear como fecha
 date_fields = ["Date of Birth", "Date of Interview", "Date of Immigration", "Year of Graduation"]
 
+def _compile(pattern, flags=0):
+    """
+    Compila un patrón con RE2 si está instalado (tiempo lineal, sin pasar por el
+    intérprete de SRE). Si RE2 no está disponible o rechaza el patrón (por ejemplo,
+    lookaheads) se compila con el módulo `re` estándar.
+    
+    Solo se traducen las banderas que usan los patrones de este módulo
+    (re.IGNORECASE y re.DOTALL). Los patrones de bytes se compilan en modo Latin-1
+    para que RE2 trate cada byte como un carácter, igual que `re`, aunque el texto
+    no sea UTF-8 válido.
+    """
+    if re2 is not None:
+        options = re2.Options()
+        options.log_errors = False
+        options.case_sensitive = not flags & re.IGNORECASE
+        options.dot_nl = bool(flags & re.DOTALL)
+        if isinstance(pattern, bytes):
+            options.encoding = re2.Options.Encoding.LATIN1
+        try:
+            return re2.compile(pattern, options)
+        except re2.error:
+            pass
+    return re.compile(pattern, flags)
+
+# Expresiones regulares precompiladas (se compilan una sola vez al cargar el módulo).
+# Son patrones de bytes: se aplican sobre el texto codificado en UTF-8 (tal cual se
+# lee de un TXT) ya pasado a minúsculas (ver extract_fields_unlabeled), por eso no
+# usan re.IGNORECASE; los valores se recortan del texto original con los offsets del
+# match y solo esos fragmentos se decodifican.
+# Con IGNORECASE, "[A-Z][a-zA-Z]+" aceptaba cualquier palabra de dos o más letras,
+# que es lo que expresa "[a-z]{2,}".
+# Los espacios se escriben como [ \t\n\r\f\x0b] y no como \s: en RE2 \s no incluye el
+# tabulador vertical (\x0b) y en Hyperscan \v abarca más que él, así que los tres motores
+# (y _CHAR_CLASSES) reconocen exactamente los mismos espacios que el \s de `re`.
+_RE_DATE_INT = _compile(
+    rb'interview.*?(\d{1,2}(?:st|nd|rd|th)?[ \t\n\r\f\x0b]+of[ \t\n\r\f\x0b]+[a-z]+[ \t\n\r\f\x0b]+\d{4})',
+    re.DOTALL)
+
+# Heurísticas de cada campo. Para Name y Siblings el patrón solo marca dónde empieza el
+# nombre (el final del match); el nombre en sí se valida sobre las clases de caracteres
+# (ver _CHAR_CLASSES). Los grupos van numerados: con RE2 los nombres de grupo de un
+# patrón de bytes también son bytes.
+_RE_NAME = _compile(rb"interview with[ \t\n\r\f\x0b]+")
+_RE_DOB = _compile(rb"born (?:on[ \t\n\r\f\x0b]+)?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})")
+_RE_POB = _compile(rb"born in[ \t\n\r\f\x0b]+([a-z \t\n\r\f\x0b]+)[\.,]")
+_RE_SIBLINGS = _compile(rb"my[ \t\n\r\f\x0b]+(?:younger[ \t\n\r\f\x0b]+)?(?:brother|sister)[ \t\n\r\f\x0b]+")
+
+# Literales fijas (iglesia, escuela, empleador y locaciones). Se buscan por separado y
+# sin lookahead, así el motor de `re` puede saltar directo a cada literal; "Chicago"
+# dentro de "... training college in Chicago" lo encuentra la búsqueda de locaciones.
+_RE_CHURCH = _compile(rb"salvation army(?: training college( in chicago)?)?")
+_RE_EMPLOYER = _compile(rb"john deere")
+_RE_LOCATIONS = _compile(rb"\b(california|moline|campbells island|chicago|florida|sweden)\b")
+
+# Búsquedas del escáner (ver _scan): (campo, subcadenas de las que alguna debe aparecer
+# en el texto o None si no hay filtro, con qué empieza el patrón para Hyperscan, patrón)
+_SCAN_SPECS = [
+    ("name", (b"interview with",), rb"interview with[ \t\n\r\f\x0b]", _RE_NAME),
+    ("dob", (b"born ",), rb"born ", _RE_DOB),
+    ("pob", (b"born in",), rb"born in[ \t\n\r\f\x0b]", _RE_POB),
+    ("sibling", (b"brother", b"sister"), rb"my[ \t\n\r\f\x0b]+(?:younger[ \t\n\r\f\x0b]+)?(?:brother|sister)[ \t\n\r\f\x0b]", _RE_SIBLINGS),
+    ("church", (b"salvation army",), rb"salvation army", _RE_CHURCH),
+    ("employer", (b"john deere",), rb"john deere", _RE_EMPLOYER),
+    ("location", None, rb"california|moline|campbells island|chicago|florida|sweden", _RE_LOCATIONS),
+]
+
+def _compile_hyperscan(expressions):
+    """
+    Compila una base de datos de Hyperscan con `expressions`, reportando el inicio de
+    cada coincidencia. Retorna None si Hyperscan no está instalado o no la acepta
+    (p. ej. un CPU sin soporte); en ese caso se usa solo `re`.
+    """
+    if hyperscan is None:
+        return None
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(expressions))
+    except hyperscan.error:
+        return None
+    return database
+
+# Prefiltro con Hyperscan: busca los inicios de todos los patrones a la vez en una sola
+# pasada (el id de cada uno es su índice en _SCAN_SPECS)
+_HS_SCAN = _compile_hyperscan([anchor for _, _, anchor, _ in _SCAN_SPECS])
+
+# El "scratch" de Hyperscan no se puede compartir entre threads: uno por thread
+_hs_local = threading.local()
+
+def _matches_at(pattern, text_lc, starts):
+    """Coincidencias de `pattern` que empiezan en las posiciones `starts`, en orden."""
+    for start in sorted(starts):
+        m = pattern.match(text_lc, start)
+        if m:
+            yield m
+
+def _scan(text_lc):
+    """
+    Retorna un dict {campo: coincidencias} con las búsquedas de _SCAN_SPECS sobre
+    `text_lc`. Las coincidencias de cada campo salen en orden y se generan a medida
+    que se consumen, así que cortar el recorrido tras la primera evita buscar el resto.
+    
+    Sin Hyperscan cada patrón se busca por separado con finditer (solo si aparece
+    alguna de sus subcadenas), que es lo más rápido con el motor de `re`: un solo
+    patrón fusionado le impide saltar directo a cada literal. Con Hyperscan las
+    posiciones candidatas de todos los patrones salen de una sola pasada y el motor
+    de `re` solo se ejecuta en ellas.
+    """
+    if _HS_SCAN is None:
+        return {
+            kind: pattern.finditer(text_lc)
+            if gates is None or any(gate in text_lc for gate in gates) else ()
+            for kind, gates, _, pattern in _SCAN_SPECS
+        }
+    scratch = getattr(_hs_local, "scratch", None)
+    if scratch is None:
+        scratch = _hs_local.scratch = hyperscan.Scratch(_HS_SCAN)
+    starts = [set() for _ in _SCAN_SPECS]
+    
+    def on_match(_id, start, end, flags, context):
+        # Solo interesa dónde empieza cada candidato; el patrón de `re` decide el resto
+        starts[_id].add(start)
+    
+    _HS_SCAN.scan(text_lc, match_event_handler=on_match, scratch=scratch)
+    return {
+        kind: _matches_at(pattern, text_lc, kind_starts)
+        for (kind, _, _, pattern), kind_starts in zip(_SCAN_SPECS, starts)
+    }
+
+# Clasificación de cada byte en una clase: "L" letra ASCII, "S" espacio (los mismos
+# que [ \t\n\r\f\x0b] en los patrones) y "." cualquier otro. El texto se traduce una
+# sola vez con bytes.translate (una búsqueda en tabla por byte, en C) y los nombres se
+# reconocen con patrones diminutos sobre esas clases en lugar de clases de caracteres
+# de regex.
+_CHAR_CLASSES = bytes(
+    ord("L") if chr(c) in string.ascii_letters else
+    ord("S") if chr(c) in string.whitespace else
+    ord(".")
+    for c in range(256))
+
+# Name: dos o más palabras de 2+ letras; Siblings: una palabra de 2+ letras
+_RE_NAME_CLASSES = _compile(rb"L{2,}(?:S+L{2,})+")
+_RE_SIBLING_CLASSES = _compile(rb"L{2,}")
+
+# Formatos más comunes de las fechas capturadas, que format_date resuelve sin dateutil
+_RE_YEAR = _compile(r"[1-9]\d{3}")
+_RE_NUMERIC_DATE = _compile(r"(\d{1,2})[/-](\d{1,2})[/-](\d{4})")
+
+def _decode(value):
+    """Decodifica un fragmento capturado (bytes UTF-8) a str."""
+    return value.decode("utf-8", "replace")
+
+@functools.lru_cache(maxsize=4096)
 def format_date(value):
     """
     Intenta formatear el valor recibido a "YYYY-MM-DD".
     
+    El resultado se memoriza: en un lote de documentos se repiten muchas fechas
+    (p. ej. el mismo año de inmigración), así que solo se parsea una vez cada valor.
+    
     Supuestos:
       - Si se recibe un número entre 1800 y 2100 se asume que es un año (se retorna "YYYY-01-01").
-      - Si se recibe una cadena, se utiliza pandas.to_datetime para el parseo.
+      - Si se recibe una cadena, se utiliza dateutil para el parseo (los componentes que
+        falten se completan con el 1 de enero, p. ej. "1920" -> "1920-01-01").
       - En caso de error se retorna "Invalid Date".
     """
     try:
@@ -67,29 +245,41 @@ def format_date(value):
                 base = datetime(1899, 12, 30)
                 converted = base + timedelta(days=float(value))
                 return converted.strftime("%Y-%m-%d")
+        # Atajos para los casos más comunes: solo el año ("1920") o una fecha numérica
+        # con año de 4 dígitos ("12/05/1920", mes primero igual que dateutil)
+        if _RE_YEAR.fullmatch(value):
+            return f"{value}-01-01"
+        numeric = _RE_NUMERIC_DATE.fullmatch(value)
+        if numeric:
+            month, day, year = (int(part) for part in numeric.groups())
+            try:
+                return datetime(year, month, day).strftime("%Y-%m-%d")
+            except ValueError:
+                pass  # p. ej. "13/05/1920": dateutil lo interpreta como día/mes
         # Intentar parsear la cadena
-        parsed = pd.to_datetime(value, errors='coerce')
-        if pd.isna(parsed):
-            return "Invalid Date"
+        parsed = date_parser.parse(value, default=datetime(2000, 1, 1))
         return parsed.strftime("%Y-%m-%d")
     except Exception as e:
         return "Invalid Date"
 
 def extract_text_from_pdf(file_path):
     """
-    Extrae todo el texto de un archivo PDF usando PyPDF2.
+    Extrae todo el texto de un archivo PDF usando PyMuPDF (MuPDF, implementado en C).
+    Retorna None si ocurre un error, para distinguirlo de un PDF que no tiene texto.
     """
-    text = ""
+    # Se acumulan las páginas en una lista y se unen al final (concatenar con += puede
+    # volverse cuadrático en documentos con muchas páginas)
+    parts = []
     try:
-        with open(file_path, "rb") as f:
-            pdf_reader = PyPDF2.PdfReader(f)
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
+        with pymupdf.open(file_path) as doc:
+            for page in doc:
+                page_text = page.get_text()
                 if page_text:
-                    text += page_text + "\n"
+                    parts.append(page_text)
     except Exception as e:
         print(f"Error leyendo {file_path}: {e}")
-    return text
+        return None
+    return "\n".join(parts)
 
 def extract_fields_unlabeled(text, filename):
     """
@@ -106,64 +296,89 @@ def extract_fields_unlabeled(text, filename):
       - "Geographical Locations": Se comprueba la presencia de algunas locaciones conocidas.
       
     Para otros campos se puede agregar nuevas reglas según el comportamiento de los documentos.
+    
+    `text` puede ser un str, o bytes con el contenido en UTF-8.
     """
     # Inicializar todos los campos con "N/A"
     data = { field: "N/A" for field in required_fields }
     
     # --- Extracción heurística de algunos campos ---
     
-    # Date of Interview: se busca una fecha cercana a la palabra "interview"
-    date_int_match = re.search(
-        r'interview.*?(\d{1,2}(?:st|nd|rd|th)?\s+of\s+[A-Za-z]+\s+\d{4})',
-        text, re.IGNORECASE | re.DOTALL)
+    # Los patrones se aplican sobre una copia en minúsculas (así no se paga el
+    # case-folding de re.IGNORECASE) y los valores se recortan del texto original.
+    # bytes.lower() solo cambia las letras ASCII, así que la copia tiene la misma
+    # longitud que el original y los offsets de un match sobre ella coinciden.
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    text_lc = text.lower()
+    
+    # Date of Interview: se busca una fecha cercana a la palabra "interview". Queda
+    # fuera de _SCAN_SPECS porque su ".*?" abarca todo el texto hasta la fecha, lo que
+    # no sirve como candidato de Hyperscan. Antes se comprueba con `in` (búsqueda de
+    # subcadena en C) que la palabra aparezca en el texto.
+    date_int_match = b"interview" in text_lc and _RE_DATE_INT.search(text_lc)
     if date_int_match:
-        data["Date of Interview"] = date_int_match.group(1).strip()
+        data["Date of Interview"] = _decode(text[date_int_match.start(1):date_int_match.end(1)]).strip()
+    
+    found = _scan(text_lc)
+    classes = None
     
-    # Name: se busca "interview with" seguido de un nombre (2 o más palabras que empiecen con mayúscula)
-    name_match = re.search(
-        r'interview with\s+([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)+)',
-        text, re.IGNORECASE)
-    if name_match:
-        data["Name"] = name_match.group(1).strip()
+    # Name: se busca "interview with" seguido de un nombre (2 o más palabras)
+    for m in found["name"]:
+        if classes is None:
+            classes = text_lc.translate(_CHAR_CLASSES)
+        name = _RE_NAME_CLASSES.match(classes, m.end())
+        if name:
+            data["Name"] = _decode(text[name.start():name.end()]).strip()
+            break
     
     # Date of Birth: buscar patrones simples como "born on" o "born 12/05/1920"
-    dob_match = re.search(r"born (?:on\s+)?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})", text, re.IGNORECASE)
-    if dob_match:
-        data["Date of Birth"] = dob_match.group(1).strip()
+    for m in found["dob"]:
+        data["Date of Birth"] = _decode(text[m.start(1):m.end(1)]).strip()
+        break
     
     # Place of Birth: buscar la frase "born in" (por ejemplo: "born in Stockholm, Sweden")
-    pob_match = re.search(r"born in\s+([A-Za-z\s]+)[\.,]", text, re.IGNORECASE)
-    if pob_match:
-        data["Place of Birth"] = pob_match.group(1).strip()
+    for m in found["pob"]:
+        data["Place of Birth"] = _decode(text[m.start(1):m.end(1)]).strip()
+        break
     
     # Siblings: buscar menciones de "my brother" o "my sister" seguido de un nombre
-    siblings_matches = re.findall(r"my\s+(?:younger\s+)?(brother|sister)\s+([A-Z][a-zA-Z]+)", text, re.IGNORECASE)
-    if siblings_matches:
-        siblings_names = {match[1] for match in siblings_matches}
+    siblings_names = set()
+    siblings_end = 0
+    for m in found["sibling"]:
+        # Las menciones de hermanos no se traslapan (como en un findall): se ignora
+        # la que empieza dentro del nombre del hermano anterior
+        if m.start() < siblings_end:
+            continue
+        if classes is None:
+            classes = text_lc.translate(_CHAR_CLASSES)
+        name = _RE_SIBLING_CLASSES.match(classes, m.end())
+        if name:
+            siblings_names.add(_decode(text[name.start():name.end()]))
+            siblings_end = name.end()
+    if siblings_names:
         data["Siblings"] = ", ".join(siblings_names)
     
-    # Church Affiliation: buscar la presencia de "Salvation Army"
-    church_match = re.search(r"(Salvation Army(?: training college)?)", text, re.IGNORECASE)
-    if church_match:
-        data["Church Affiliation"] = church_match.group(1).strip()
+    # Church Affiliation ("Salvation Army") y Schools Attended ("Salvation Army training
+    # college in Chicago"): la primera mención da la iglesia y la primera que sigue
+    # hasta "in Chicago" da la escuela
+    for m in found["church"]:
+        if data["Church Affiliation"] == "N/A":
+            end = m.start(1) if m.group(1) else m.end()
+            data["Church Affiliation"] = _decode(text[m.start():end])
+        if m.group(1):
+            data["Schools Attended"] = _decode(text[m.start():m.end()])
+            break
     
     # Employer: detectar si se menciona "John Deere" (ejemplo específico)
-    employer_match = re.search(r"(John Deere)", text, re.IGNORECASE)
-    if employer_match:
-        data["Employer"] = employer_match.group(1).strip()
-    
-    # Schools Attended: búsqueda de la mención de "training college in Chicago"
-    education_match = re.search(r"(Salvation Army training college in Chicago)", text, re.IGNORECASE)
-    if education_match:
-        data["Schools Attended"] = education_match.group(1).strip()
+    for m in found["employer"]:
+        data["Employer"] = _decode(text[m.start():m.end()])
+        break
     
     # Geographical Locations: comprobación simple de locaciones conocidas
-    locations_found = []
-    for loc in ["California", "Moline", "Campbells Island", "Chicago", "Florida", "Sweden"]:
-        if re.search(loc, text, re.IGNORECASE):
-            locations_found.append(loc)
+    locations_found = {_decode(m.group(1)).title() for m in found["location"]}
     if locations_found:
-        data["Geographical Locations"] = ", ".join(sorted(set(locations_found)))
+        data["Geographical Locations"] = ", ".join(sorted(locations_found))
     
     # --- Otros campos se dejan en "N/A" o se pueden implementar reglas adicionales ---
     # Si necesitas extraer más datos (por ejemplo, "Parent's Names", "Occupation", "Spouse's Name",
@@ -180,43 +395,178 @@ def extract_fields_unlabeled(text, filename):
     
     return data
 
+def prefetch_file(path):
+    """
+    Pide al kernel que empiece a leer el archivo en segundo plano
+    (POSIX_FADV_WILLNEED), de modo que cuando un worker lo abra ya esté (o vaya
+    llegando) a la caché de páginas y la latencia del disco se solape con el parseo.
+    Solo existe en sistemas POSIX como Linux; en los demás no hace nada.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def gil_enabled():
+    """
+    Indica si el intérprete tiene GIL. En builds free-threaded de CPython (3.13t en
+    adelante) sys._is_gil_enabled() retorna False; en versiones anteriores no existe
+    y siempre hay GIL.
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is None or is_gil_enabled()
+
+def pdf_cache_key(file_path):
+    """
+    Calcula la clave de un PDF en la caché de main(): el hash BLAKE2b de su contenido
+    junto con la versión de PyMuPDF. Dos archivos con el mismo contenido (p. ej. copias
+    del mismo escaneo) tienen la misma clave, así que su texto solo se extrae una vez;
+    al actualizar PyMuPDF cambian todas las claves y el texto se vuelve a extraer.
+    
+    Retorna None si el archivo no se puede leer; el error lo reporta process_file
+    al intentar extraer el texto, igual que con cualquier otro archivo ilegible.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return f"{pymupdf.VersionBind}:{digest.hexdigest()}"
+
+def process_file(file_path, cached_text=None):
+    """
+    Procesa un solo archivo PDF/TXT: extrae su texto y aplica la extracción heurística.
+    Se ejecuta en los workers de los pools de main() (procesos, o threads si no hay que
+    extraer el texto de un PDF), por lo que debe ser una función de nivel de módulo
+    (serializable con pickle).
+    
+    Si se recibe `cached_text` (texto de un PDF ya extraído en otra corrida) no se
+    vuelve a parsear el PDF. Retorna (datos, texto) donde texto es el texto del PDF
+    recién extraído, para que main() lo guarde en la caché, o None (TXT, texto tomado
+    de la caché o error al extraer: un fallo no se debe guardar como resultado).
+    """
+    filename = os.path.basename(file_path)
+    print(f"Procesando archivo: {filename}")
+    
+    # Extraer el texto: usar PyMuPDF si es PDF; los TXT se leen como bytes y los
+    # patrones (de bytes) trabajan sobre ellos, sin decodificar todo el archivo
+    if filename.lower().endswith(".pdf"):
+        if cached_text is not None:
+            return extract_fields_unlabeled(cached_text, filename), None
+        text = extract_text_from_pdf(file_path)
+        return extract_fields_unlabeled(text or "", filename), text
+    
+    try:
+        with open(file_path, "rb") as f:
+            text = f.read()
+    except OSError as e:
+        print(f"Error leyendo {file_path}: {e}")
+        text = b""
+    return extract_fields_unlabeled(text, filename), None
+
 def main():
     # Directorio de entrada: ajustar el path según donde estén tus archivos PDF/TXT
     input_dir = "./input_files"  
     output_file = "Resultado.csv"
+    # Caché persistente (entre corridas) del texto de los PDF (ver pdf_cache_key)
+    cache_file = "pdf_cache.db"
     
-    resultados = []
-    
-    # Iterar sobre cada archivo del directorio
-    for filename in os.listdir(input_dir):
-        lower_filename = filename.lower()
-        if lower_filename.endswith((".pdf", ".txt")):
-            file_path = os.path.join(input_dir, filename)
-            print(f"Procesando archivo: {filename}")
-            
-            # Extraer el texto: usar PyPDF2 si es PDF o leer directamente si es TXT
-            if lower_filename.endswith(".pdf"):
-                text = extract_text_from_pdf(file_path)
-            else:
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        text = f.read()
-                except Exception as e:
-                    print(f"Error leyendo {file_path}: {e}")
-                    text = ""
-            
-            # Aplicar la función de extracción heurística
-            data = extract_fields_unlabeled(text, filename)
-            resultados.append(data)
-    
-    if resultados:
-        # Crear DataFrame con los campos en el orden requerido
-        df_result = pd.DataFrame(resultados, columns=required_fields)
-        # Exportar a CSV (puedes cambiar a .xlsx si prefieres)
-        df_result.to_csv(output_file, index=False, quoting=csv.QUOTE_ALL)
-        print(f"Extracción completada. Resultado guardado en '{output_file}'.")
-    else:
+    # Reunir los archivos compatibles del directorio (os.scandir ya trae el nombre, la
+    # ruta y el tipo de cada entrada, sin llamadas extra al sistema por archivo)
+    with os.scandir(input_dir) as entries:
+        paths = [
+            entry.path
+            for entry in entries
+            if entry.is_file() and entry.name.lower().endswith((".pdf", ".txt"))
+        ]
+    
+    if not paths:
         print("No se encontraron archivos compatibles en el directorio especificado.")
+        return
+    
+    # Cada archivo es independiente: se reparten entre workers para aprovechar todos
+    # los núcleos. La extracción es CPU-bound y el motor de regex no suelta el GIL,
+    # así que con GIL se usan procesos; sin GIL (free-threaded) bastan threads, que
+    # no pagan el arranque de procesos ni serializan el texto de la caché.
+    # PyMuPDF no es thread-safe (al importarse configura MuPDF sin locks), así que los
+    # PDF cuyo texto hay que extraer van siempre al pool de procesos; los threads solo
+    # reciben TXT y PDF con texto en caché. Los pools crean sus workers al primer
+    # envío, así que el que no se usa no cuesta nada.
+    use_threads = not gil_enabled()
+    max_workers = os.cpu_count() or 1
+    # Archivos en vuelo a la vez: suficientes para mantener ocupados a los workers,
+    # pero acotados para que la memoria no crezca con el tamaño del lote
+    max_pending = 2 * max_workers
+    
+    # La caché solo se toca desde este proceso (shelve no admite escrituras
+    # concurrentes desde los workers)
+    with shelve.open(cache_file) as cache, \
+            open(output_file, "w", newline='', encoding="utf-8") as f, \
+            ProcessPoolExecutor(max_workers=max_workers) as process_pool, \
+            ThreadPoolExecutor(max_workers=max_workers) as thread_pool:
+        writer = csv.DictWriter(f, fieldnames=required_fields,
+                                quoting=csv.QUOTE_ALL, lineterminator="\n")
+        writer.writeheader()
+        
+        # PDF que se están extrayendo ahora: clave -> future de su extracción
+        inflight = {}
+        
+        def write_result(key, future):
+            # Cada resultado se escribe al CSV en cuanto llega, en el orden de `paths`
+            data, text = future.result()
+            writer.writerow(data)
+            if key is not None:
+                if text is not None:
+                    cache[key] = text
+                if inflight.get(key) is future:
+                    del inflight[key]
+        
+        # Se adelanta la lectura solo de los archivos que entrarán pronto a la ventana
+        # de `max_pending`: pedirla para todo el lote de una vez hace una llamada por
+        # archivo antes de empezar y, si el lote no cabe en memoria, el kernel descarta
+        # las primeras páginas antes de usarlas
+        for path in paths[:max_pending]:
+            prefetch_file(path)
+        
+        pending = collections.deque()
+        for i, path in enumerate(paths):
+            if i + max_pending < len(paths):
+                prefetch_file(paths[i + max_pending])
+            # Los PDF cuyo contenido ya se procesó antes reciben su texto de la caché;
+            # se busca justo antes de enviar el archivo, así solo se tiene en memoria
+            # el texto de los archivos en vuelo
+            is_pdf = path.lower().endswith(".pdf")
+            key = pdf_cache_key(path) if is_pdf else None
+            cached_text = None
+            if key in inflight:
+                # Otra copia del mismo PDF todavía se está extrayendo (aún no llegó a la
+                # caché): se espera su texto en lugar de extraerlo de nuevo
+                cached_text = inflight[key].result()[1]
+            elif key is not None:
+                cached_text = cache.get(key)
+            if use_threads and not (is_pdf and cached_text is None):
+                executor = thread_pool
+            else:
+                executor = process_pool
+            future = executor.submit(process_file, path, cached_text)
+            if key is not None and cached_text is None:
+                inflight[key] = future
+            pending.append((key, future))
+            if len(pending) >= max_pending:
+                write_result(*pending.popleft())
+        while pending:
+            write_result(*pending.popleft())
+    print(f"Extracción completada. Resultado guardado en '{output_file}'.")
 
 if __name__ == '__main__':
     main()